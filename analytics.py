@@ -4,8 +4,11 @@ import json
 from collections import defaultdict
 import io
 import base64
+import gzip
+import sys
 from dateutil.parser import parse
 from config import Config
+from utils import file_version
 
 try:
     import matplotlib.pyplot as plt
@@ -20,6 +23,7 @@ BUS_DATA_FILE = os.path.join(DATA_DIR, "bus_data.json")
 HISTORY_FILE = os.path.join(DATA_DIR, "history.json")
 FEEDBACK_FILE = os.path.join(DATA_DIR, "feedback.json")
 REPORTS_DIR = os.path.join(DATA_DIR, "reports")
+REPORT_INDEX_FILE = os.path.join(REPORTS_DIR, "index.json")
 
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
@@ -41,6 +45,10 @@ def save_json(file_path, data):
     with open(file_path, "w") as f:
         json.dump(data, f, indent=4)
 
+def get_data_version():
+    """Return a cheap version stamp (mtime and size) of the history and feedback files."""
+    return (file_version(HISTORY_FILE), file_version(FEEDBACK_FILE))
+
 def get_bus_utilization(days=7):
     """Get bus utilization statistics for the last N days."""
     history = load_json(HISTORY_FILE, default={"occupancy_patterns": {}})
@@ -143,6 +151,8 @@ def get_route_performance(days=7):
                 if timestamp >= cutoff_date:
                     eta_parts = entry["estimated_time"].split(":")
                     estimated_minutes = int(eta_parts[0]) * 60 + int(eta_parts[1])
+                    if len(eta_parts) > 2:
+                        estimated_minutes += int(eta_parts[2]) / 60
                     
                     route_times[route_key].append(estimated_minutes)
                     route_distances[route_key].append(entry["distance"])
@@ -155,7 +165,7 @@ def get_route_performance(days=7):
         if route_times[route_key]:
             avg_time = sum(route_times[route_key]) / len(route_times[route_key])
             avg_distance = sum(route_distances[route_key]) / len(route_distances[route_key])
-            avg_speed = avg_distance / (avg_time / 60)  # km/h
+            avg_speed = avg_distance / (avg_time / 60) if avg_time else 0  # km/h
             
             route_stats[route_key] = {
                 "avg_time_minutes": round(avg_time, 1),
@@ -182,8 +192,8 @@ def get_route_performance(days=7):
         "slowest_route_time": slowest_route[1]["avg_time_minutes"]
     }
 
-def generate_utilization_chart():
-    """Generate a chart showing bus utilization by hour of day."""
+def render_utilization_chart():
+    """Render a PNG chart showing bus utilization by hour of day; returns bytes or None."""
     if not PLOTTING_AVAILABLE:
         return None
         
@@ -209,15 +219,12 @@ def generate_utilization_chart():
     
     buffer = io.BytesIO()
     plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    
-    image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
     plt.close()
     
-    return image_base64
+    return buffer.getvalue()
 
-def generate_route_performance_chart():
-    """Generate a chart showing performance of different routes."""
+def render_route_performance_chart():
+    """Render a PNG chart showing performance of different routes; returns bytes or None."""
     if not PLOTTING_AVAILABLE:
         return None
         
@@ -260,12 +267,9 @@ def generate_route_performance_chart():
     
     buffer = io.BytesIO()
     plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    
-    image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
     plt.close()
     
-    return image_base64
+    return buffer.getvalue()
 
 def get_feedback_statistics():
     """Analyze user feedback."""
@@ -297,10 +301,89 @@ def get_feedback_statistics():
         "bus_ratings": {bus: round(rating, 2) for bus, rating in bus_avg_ratings.items()}
     }
 
+def _report_paths(date):
+    base = os.path.join(REPORTS_DIR, f"report_{date}")
+    return {
+        "body": base + ".json.gz",
+        "legacy": base + ".json",
+        "utilization_chart": base + "_utilization.png",
+        "route_performance_chart": base + "_route_performance.png"
+    }
+
+def _headline(report):
+    """Per-day summary metrics stored in the report index."""
+    utilization = report.get("utilization", {})
+    routes = report.get("route_performance", {})
+    feedback = report.get("feedback", {})
+    return {
+        "active_buses": report.get("active_buses", 0),
+        "average_occupancy": utilization.get("average_occupancy", 0),
+        "peak_time": utilization.get("peak_time", "N/A"),
+        "peak_occupancy": utilization.get("peak_occupancy", 0),
+        "busiest_bus": utilization.get("busiest_bus", "N/A"),
+        "fastest_route": routes.get("fastest_route", "N/A"),
+        "slowest_route": routes.get("slowest_route", "N/A"),
+        "average_rating": feedback.get("average_rating", 0),
+        "total_feedback": feedback.get("total_feedback", 0)
+    }
+
+def load_report_index():
+    """Load the report index: {"YYYY-MM-DD": headline metrics}."""
+    return load_json(REPORT_INDEX_FILE, default={})
+
+def _write_report_index(index):
+    # Write a temp file and swap it in, so an interrupted write never leaves a truncated index
+    tmp_file = REPORT_INDEX_FILE + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(dict(sorted(index.items())), f, separators=(",", ":"))
+    os.replace(tmp_file, REPORT_INDEX_FILE)
+
+def _update_report_index(report):
+    index = load_report_index()
+    index[report["date"]] = _headline(report)
+    _write_report_index(index)
+
+def rebuild_report_index():
+    """Rebuild index.json from every stored report body; returns the number indexed."""
+    index = {}
+    for name in sorted(os.listdir(REPORTS_DIR)):
+        if not name.startswith("report_"):
+            continue
+        if name.endswith(".json.gz"):
+            date = name[len("report_"):-len(".json.gz")]
+        elif name.endswith(".json"):
+            date = name[len("report_"):-len(".json")]
+        else:
+            continue
+        try:
+            report = load_report(date)
+        except (OSError, EOFError, ValueError) as e:
+            print(f"Error reading report {name}: {e}")
+            continue
+        if report and "date" in report:
+            index[report["date"]] = _headline(report)
+    _write_report_index(index)
+    return len(index)
+
+def _save_report(report, charts):
+    """Write chart PNGs and the gzip-compressed report body, then index it."""
+    paths = _report_paths(report["date"])
+    report["charts"] = {}
+    for name, png in charts.items():
+        if png:
+            with open(paths[name], "wb") as f:
+                f.write(png)
+            report["charts"][name] = os.path.basename(paths[name])
+        else:
+            report["charts"][name] = None
+
+    with gzip.open(paths["body"], "wt", encoding="utf-8") as f:
+        json.dump(report, f, separators=(",", ":"))
+    _update_report_index(report)
+
 def generate_daily_report():
     """Generate a comprehensive daily report."""
     today = datetime.now().strftime("%Y-%m-%d")
-    report_file = os.path.join(REPORTS_DIR, f"report_{today}.json")
     
     utilization = get_bus_utilization()
     route_performance = get_route_performance()
@@ -308,12 +391,11 @@ def generate_daily_report():
     
     current_data = load_json(BUS_DATA_FILE)
     
-    utilization_chart = None
-    route_performance_chart = None
+    charts = {"utilization_chart": None, "route_performance_chart": None}
     
     if PLOTTING_AVAILABLE:
-        utilization_chart = generate_utilization_chart()
-        route_performance_chart = generate_route_performance_chart()
+        charts["utilization_chart"] = render_utilization_chart()
+        charts["route_performance_chart"] = render_route_performance_chart()
     
     report = {
         "date": today,
@@ -321,18 +403,62 @@ def generate_daily_report():
         "utilization": utilization,
         "route_performance": route_performance,
         "feedback": feedback,
-        "active_buses": len(current_data.get("buses", {})),
-        "charts": {
-            "utilization_chart": utilization_chart,
-            "route_performance_chart": route_performance_chart
-        }
+        "active_buses": len(current_data.get("buses", {}))
     }
     
-    save_json(report_file, report)
+    _save_report(report, charts)
     
     return report
 
+def load_report(date):
+    """
+    Load the report for a date (YYYY-MM-DD), or None if there is none.
+    Chart entries are PNG filenames inside REPORTS_DIR.
+    """
+    paths = _report_paths(date)
+    if os.path.exists(paths["body"]):
+        with gzip.open(paths["body"], "rt", encoding="utf-8") as f:
+            return json.load(f)
+    if os.path.exists(paths["legacy"]):
+        return load_json(paths["legacy"], default=None)
+    return None
+
+def get_report_trend(months=3):
+    """Headline metrics per day for the last N months, read from the index only."""
+    cutoff = (datetime.now() - timedelta(days=30 * months)).strftime("%Y-%m-%d")
+    return [
+        dict(date=date, **metrics)
+        for date, metrics in sorted(load_report_index().items())
+        if date >= cutoff
+    ]
+
+def migrate_legacy_reports():
+    """Convert report_*.json files with embedded base64 charts to the split format."""
+    migrated = 0
+    for name in sorted(os.listdir(REPORTS_DIR)):
+        if not (name.startswith("report_") and name.endswith(".json")):
+            continue
+        legacy_path = os.path.join(REPORTS_DIR, name)
+        report = load_json(legacy_path, default=None)
+        if not report or "date" not in report:
+            continue
+        encoded = report.pop("charts", None) or {}
+        charts = {
+            chart: base64.b64decode(encoded[chart]) if encoded.get(chart) else None
+            for chart in ("utilization_chart", "route_performance_chart")
+        }
+        _save_report(report, charts)
+        os.remove(legacy_path)
+        migrated += 1
+    return migrated
+
 if __name__ == "__main__":
+    if "--migrate" in sys.argv:
+        print(f"Migrated {migrate_legacy_reports()} legacy report(s)")
+        sys.exit(0)
+    if "--reindex" in sys.argv:
+        print(f"Indexed {rebuild_report_index()} report(s)")
+        sys.exit(0)
     report = generate_daily_report()
     print(f"Report generated: {report['date']}")
     print(f"Active buses: {report['active_buses']}")
@@ -1,25 +1,73 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response
 import os
 import random
 import io
 import base64
 import matplotlib.pyplot as plt
 from datetime import datetime
-from utils import generate_qr_code  # Make sure utils.py has this function
+from utils import generate_qr_code, file_version  # Make sure utils.py has this function
+from assets import init_assets
+from route_layers import RouteLayerCache
+from route_catalog import get_catalog
+from cache import CoalescingCache
+from ratelimit import RateLimiter
+import analytics as analytics_data
+from config import Config
 import json
 
 app = Flask(__name__)
+init_assets(app)
+route_layer_cache = RouteLayerCache()
+analytics_cache = CoalescingCache(ttl=Config.ANALYTICS_CACHE_TTL)
+rate_limiter = RateLimiter(
+    Config.RATE_LIMITS,
+    Config.RATE_LIMITED_ENDPOINTS,
+    max_concurrent=Config.MAX_CONCURRENT_REQUESTS,
+    expensive_share=Config.EXPENSIVE_REQUEST_SHARE
+)
+rate_limiter.init_app(app)
 
 # --------------------------------------------------
 # Helper functions for live data
 # --------------------------------------------------
+BUS_DATA_FILE = os.path.join(Config.DATA_DIR, "bus_data.json")
+BUS_FIELDS = ("bus_id", "route_id", "occupancy", "capacity", "eta", "status", "on_time",
+              "distance_to_destination", "destination", "last_update", "location")
+
+# (file version, (buses, last_updated)); replaced whole so readers never see a partial update
+_fleet_snapshot = (None, ({}, ""))
+
 def load_buses():
-    try:
-        with open("data/bus_data.json", "r") as f:
-            data = json.load(f)
-        return data.get("buses", {}), data.get("last_updated", "")
-    except Exception:
+    """Return (buses, last_updated), re-reading bus_data.json only when it has changed."""
+    global _fleet_snapshot
+    version = file_version(BUS_DATA_FILE)
+    if version is None:
         return {}, ""
+    if _fleet_snapshot[0] != version:
+        try:
+            with open(BUS_DATA_FILE, "r") as f:
+                data = json.load(f)
+        except Exception:
+            return {}, ""
+        _fleet_snapshot = (version, (data.get("buses", {}), data.get("last_updated", "")))
+    return _fleet_snapshot[1]
+
+def bus_record(bus_id, bus, catalog):
+    """Public view of one bus; fields missing from the feed are None."""
+    route = catalog.route(bus.get("route_id", "")) or catalog.route_for_bus(bus_id)
+    return {
+        "bus_id": bus_id,
+        "route_id": bus.get("route_id", ""),
+        "occupancy": bus.get("occupancy", 0),
+        "capacity": bus.get("capacity", 0),
+        "eta": bus.get("eta", ""),
+        "status": bus.get("status", ""),
+        "on_time": bus.get("on_time", True),
+        "distance_to_destination": bus.get("distance_to_destination"),
+        "destination": catalog.stops[route.stop_ids[-1]].key if route and route.stop_ids else "Unknown",
+        "last_update": bus.get("last_update"),
+        "location": bus.get("location"),
+    }
 
 def load_routes():
     try:
@@ -73,34 +121,120 @@ def get_routes():
     routes = load_routes()
     return jsonify(routes)
 
+@app.route("/api/routes/geojson")
+def get_route_layers():
+    zoom = request.args.get("zoom", Config.MAP_DEFAULT_ZOOM, type=int)
+    body, etag = route_layer_cache.get(zoom)
+    response = Response(body, mimetype="application/geo+json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "public, max-age=0, must-revalidate"
+    return response.make_conditional(request)
+
 @app.route("/api/bus/<bus_id>")
 def get_bus(bus_id):
     buses, _ = load_buses()
-    routes = load_routes()
     if bus_id not in buses:
         return jsonify({"status": "error", "message": "Bus not found"}), 404
 
-    bus = buses[bus_id]
-    route_info = routes.get(bus["route_id"], {})
-    bus_data = {
-        "bus_id": bus_id,
-        "route_id": bus.get("route_id", ""),
-        "occupancy": bus.get("occupancy", 0),
-        "capacity": bus.get("capacity", 0),
-        "eta": bus.get("eta", ""),
-        "status": bus.get("status", ""),
-        "on_time": bus.get("on_time", True),
-        "distance_to_destination": bus.get("distance_to_destination", round(random.uniform(1.0, 8.0), 2)),
-        "destination": route_info.get("end", "Unknown"),
-        "last_update": bus.get("last_update", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
-    }
+    bus_data = bus_record(bus_id, buses[bus_id], get_catalog())
+    del bus_data["location"]
+    if bus_data["distance_to_destination"] is None:
+        bus_data["distance_to_destination"] = round(random.uniform(1.0, 8.0), 2)
+    if bus_data["last_update"] is None:
+        bus_data["last_update"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     return jsonify({"status": "success", "data": bus_data})
 
+@app.route("/api/buses/lookup", methods=["GET", "POST"])
+def lookup_buses():
+    """
+    Look up many buses from one fleet snapshot.
+    GET ?ids=bus_L1,bus_M2&fields=eta,occupancy or POST {"ids": [...], "fields": [...]}.
+    """
+    if request.method == "POST":
+        payload = request.get_json(silent=True)
+        if payload is None:
+            payload = {}
+        if not isinstance(payload, dict):
+            return jsonify({"status": "error", "message": "Body must be a JSON object"}), 400
+        bus_ids = payload.get("ids") or []
+        fields = payload.get("fields") or []
+        if not (isinstance(bus_ids, list) and isinstance(fields, list)
+                and all(isinstance(v, str) for v in bus_ids + fields)):
+            return jsonify({"status": "error", "message": "ids and fields must be lists of strings"}), 400
+    else:
+        bus_ids = [b for b in request.args.get("ids", "").split(",") if b]
+        fields = [f for f in request.args.get("fields", "").split(",") if f]
+
+    if not bus_ids:
+        return jsonify({"status": "error", "message": "No bus ids given"}), 400
+    if len(bus_ids) > Config.MAX_BULK_BUS_IDS:
+        return jsonify({"status": "error",
+                        "message": f"At most {Config.MAX_BULK_BUS_IDS} bus ids per request"}), 400
+    unknown_fields = [f for f in fields if f not in BUS_FIELDS]
+    if unknown_fields:
+        return jsonify({"status": "error",
+                        "message": f"Unknown fields: {', '.join(unknown_fields)}",
+                        "fields": list(BUS_FIELDS)}), 400
+
+    buses, last_updated = load_buses()
+    catalog = get_catalog()
+    data = {}
+    missing = []
+    for bus_id in dict.fromkeys(bus_ids):
+        if bus_id not in buses:
+            missing.append(bus_id)
+            continue
+        record = bus_record(bus_id, buses[bus_id], catalog)
+        data[bus_id] = {f: record[f] for f in fields} if fields else record
+
+    return jsonify({"status": "success", "data": data, "missing": missing, "last_updated": last_updated})
+
 @app.route("/feedback", methods=["POST"])
 def feedback():
     # Placeholder for feedback submission
     return jsonify({"status": "success", "message": "Feedback recorded."})
 
+# --------------------------------------------------
+# Analytics API
+# --------------------------------------------------
+def cached_analytics(name, compute, *args):
+    key = (name, args, analytics_data.get_data_version())
+    return analytics_cache.get(key, lambda: compute(*args))
+
+def parse_days():
+    """Return ?days= as an int in 1..ANALYTICS_MAX_DAYS, or None if it is invalid."""
+    try:
+        days = int(request.args.get("days", 7))
+    except ValueError:
+        return None
+    return days if 1 <= days <= Config.ANALYTICS_MAX_DAYS else None
+
+def invalid_days():
+    return jsonify({"status": "error",
+                    "message": f"days must be an integer from 1 to {Config.ANALYTICS_MAX_DAYS}"}), 400
+
+@app.route("/api/analytics/utilization")
+def analytics_utilization():
+    days = parse_days()
+    if days is None:
+        return invalid_days()
+    return jsonify(cached_analytics("utilization", analytics_data.get_bus_utilization, days))
+
+@app.route("/api/analytics/routes")
+def analytics_routes():
+    days = parse_days()
+    if days is None:
+        return invalid_days()
+    return jsonify(cached_analytics("routes", analytics_data.get_route_performance, days))
+
+@app.route("/api/analytics/feedback")
+def analytics_feedback():
+    return jsonify(cached_analytics("feedback", analytics_data.get_feedback_statistics))
+
+@app.route("/api/stats/limits")
+def limit_stats():
+    return jsonify(rate_limiter.stats())
+
 # --------------------------------------------------
 # Analytics Page
 # --------------------------------------------------
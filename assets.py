@@ -0,0 +1,159 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+from flask import request, send_from_directory
+from config import Config
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+    print("Warning: brotli not available. Only gzip asset variants will be built.")
+
+STATIC_DIR = Config.STATIC_DIR
+DIST_DIR = "dist"
+MANIFEST_FILE = os.path.join(STATIC_DIR, DIST_DIR, "manifest.json")
+
+# Source assets referenced by the templates, relative to STATIC_DIR
+ASSET_FILES = ["css/style.css", "js/script.js", "js/map_script.js"]
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+# ==========================================================
+# MINIFICATION
+# ==========================================================
+def minify_css(source):
+    """Strip comments and collapse whitespace in a stylesheet."""
+    source = re.sub(r"/\*.*?\*/", "", source, flags=re.S)
+    source = re.sub(r"\s+", " ", source)
+    source = re.sub(r"\s*([{};,>])\s*", r"\1", source)
+    source = re.sub(r":\s+", ":", source)
+    return source.replace(";}", "}").strip()
+
+
+def minify_js(source):
+    """
+    Line-based script minifier: strips leading and trailing whitespace from
+    every line and drops blank lines and lines starting with //. Line breaks
+    are kept, so automatic semicolon insertion is unaffected. It does not
+    parse the script: inside multi-line template literals it also strips
+    indentation and drops lines starting with //.
+    """
+    lines = []
+    for line in source.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("//"):
+            continue
+        lines.append(stripped)
+    return "\n".join(lines) + "\n"
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+# ==========================================================
+# BUILD
+# ==========================================================
+def build_assets(static_dir=STATIC_DIR):
+    """
+    Minify, fingerprint and precompress ASSET_FILES into static/dist.
+    Returns the manifest mapping source names to fingerprinted names.
+    """
+    manifest = {}
+    for name in ASSET_FILES:
+        source_path = os.path.join(static_dir, name)
+        if not os.path.exists(source_path):
+            print(f"[WARN] Asset {source_path} not found, skipping")
+            continue
+
+        with open(source_path, "r", encoding="utf-8") as f:
+            source = f.read()
+        base, ext = os.path.splitext(name)
+        minify = MINIFIERS.get(ext, lambda text: text)
+        content = minify(source).encode("utf-8")
+
+        digest = hashlib.sha256(content).hexdigest()[:10]
+        built_name = f"{DIST_DIR}/{base}.{digest}{ext}"
+        built_path = os.path.join(static_dir, built_name)
+        os.makedirs(os.path.dirname(built_path), exist_ok=True)
+
+        with open(built_path, "wb") as f:
+            f.write(content)
+        with open(built_path + ".gz", "wb") as f:
+            f.write(gzip.compress(content, compresslevel=9, mtime=0))
+        if BROTLI_AVAILABLE:
+            with open(built_path + ".br", "wb") as f:
+                f.write(brotli.compress(content))
+
+        manifest[name] = built_name
+        print(f"[INFO] {name} -> {built_name} ({len(source)} -> {len(content)} bytes)")
+
+    manifest_path = os.path.join(static_dir, DIST_DIR, "manifest.json")
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
+
+
+# ==========================================================
+# FLASK INTEGRATION
+# ==========================================================
+def load_manifest(manifest_file=MANIFEST_FILE):
+    """Return the asset manifest, or {} when assets have not been built."""
+    if not os.path.exists(manifest_file):
+        return {}
+    try:
+        with open(manifest_file, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        print(f"[ERROR] Failed to read asset manifest {manifest_file}")
+        return {}
+
+
+def init_assets(app):
+    """
+    Rewrite url_for('static', ...) to fingerprinted assets and serve them
+    precompressed with immutable cache headers. Without a built manifest
+    the app serves the plain source files as before.
+    """
+    manifest = load_manifest(os.path.join(app.static_folder, DIST_DIR, "manifest.json"))
+    fingerprinted = set(manifest.values())
+    serve_static = app.view_functions["static"]
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        if endpoint == "static" and values.get("filename") in manifest:
+            values["filename"] = manifest[values["filename"]]
+
+    def send_static_asset(filename):
+        if filename not in fingerprinted:
+            return serve_static(filename=filename)
+
+        accepted = request.accept_encodings
+        for encoding, suffix in ENCODINGS:
+            variant = os.path.join(app.static_folder, filename + suffix)
+            if accepted[encoding] and os.path.exists(variant):
+                mimetype = "text/css" if filename.endswith(".css") else "application/javascript"
+                response = send_from_directory(app.static_folder, filename + suffix, mimetype=mimetype,
+                                               download_name=os.path.basename(filename))
+                response.headers["Content-Encoding"] = encoding
+                break
+        else:
+            response = serve_static(filename=filename)
+
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        response.vary.add("Accept-Encoding")
+        return response
+
+    app.view_functions["static"] = send_static_asset
+    return manifest
+
+
+if __name__ == "__main__":
+    built = build_assets()
+    print(f"Built {len(built)} assets into {os.path.join(STATIC_DIR, DIST_DIR)}")
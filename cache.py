@@ -0,0 +1,82 @@
+import threading
+import time
+
+
+class _Flight:
+    """One in-progress computation that concurrent callers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class CoalescingCache:
+    """
+    TTL cache with single-flight coalescing.
+
+    While a key is being computed, every other caller asking for the same
+    key waits for that result instead of starting its own computation, so
+    N simultaneous misses cost one computation. Results live for `ttl`
+    seconds; callers put a data version in the key to invalidate early.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key, compute):
+        """Return the cached value for key, calling compute() at most once per miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if flight.error is None:
+                    now = time.monotonic()
+                    # Drop expired entries (e.g. superseded data versions)
+                    self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                    self._entries[key] = (now + self.ttl, flight.value)
+            flight.done.set()
+        return flight.value
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced
+            }
@@ -77,7 +77,26 @@ class Config:
     }
 
     REFRESH_INTERVAL = 30 
+
+    # -------------------- RATE LIMITS --------------------
+    # budget: (tokens per second, burst, expensive)
+    RATE_LIMITS = {
+        "buses": (1.0, 10, False),
+        "bus": (2.0, 20, False),
+        "analytics": (0.2, 3, True)
+    }
+    RATE_LIMITED_ENDPOINTS = {
+        "get_buses": "buses",
+        "get_bus": "bus",
+        "lookup_buses": "bus",
+        "analytics": "analytics"
+    }
+    MAX_CONCURRENT_REQUESTS = 16
+    MAX_BULK_BUS_IDS = 50  # bus ids accepted per /api/buses/lookup request
+    EXPENSIVE_REQUEST_SHARE = 0.5  # fraction of MAX_CONCURRENT_REQUESTS expensive budgets may use
     ANALYTICS_ENABLED = True
+    ANALYTICS_CACHE_TTL = 60  # seconds
+    ANALYTICS_MAX_DAYS = 365  # largest ?days= window the analytics API accepts
     
     MAP_DEFAULT_ZOOM = 15
     MAP_MAX_ZOOM = 18
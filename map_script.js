@@ -253,7 +253,7 @@ document.addEventListener("DOMContentLoaded", function () {
             if (!ctx) return;
 
             const labels = Object.keys(data.routes || {});
-            const durations = Object.values(data.routes || {});
+            const durations = Object.values(data.routes || {}).map(route => route.avg_time_minutes);
             new Chart(ctx, {
                 type: "line",
                 data: {
@@ -0,0 +1,133 @@
+import math
+import threading
+import time
+from collections import defaultdict
+from flask import g, jsonify, request
+
+MAX_BUCKETS = 10000  # hard cap on tracked (client, budget) buckets
+PRUNE_TO = 9000      # pruning frees room down to this, so scans happen once per ~1000 new clients
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `burst`."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, now):
+        """Consume one token; return 0 on success or seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    Per-client admission control for the polling endpoints.
+
+    Each endpoint maps to a named budget (rate, burst, expensive). A client
+    (by IP) gets its own token bucket per budget and receives 429 once it is
+    empty. Independently, a global cap limits requests in flight; expensive
+    budgets may only use `expensive_share` of it, so heavy renders are shed
+    with 503 before cheap polls are.
+    """
+
+    def __init__(self, budgets, endpoints, max_concurrent, expensive_share=0.5):
+        self.budgets = budgets
+        self.endpoints = endpoints
+        self.max_concurrent = max_concurrent
+        self.expensive_limit = max(1, int(max_concurrent * expensive_share))
+        self.in_flight = 0
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.allowed = defaultdict(int)
+        self.rate_limited = defaultdict(int)
+        self.shed = defaultdict(int)
+
+    def init_app(self, app):
+        app.before_request(self._admit)
+        app.teardown_request(self._release)
+
+    @staticmethod
+    def client_id():
+        return request.remote_addr or "unknown"
+
+    def _bucket(self, client, budget, now):
+        key = (client, budget)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= MAX_BUCKETS:
+                self._prune(now)
+            rate, burst, _ = self.budgets[budget]
+            bucket = self._buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+    def _prune(self, now):
+        # A bucket that would have refilled completely carries no state worth keeping
+        buckets = {
+            key: b for key, b in self._buckets.items()
+            if b.tokens + (now - b.updated) * b.rate < b.burst
+        }
+        if len(buckets) > PRUNE_TO:
+            # Still too many partly drained clients: evict the least recently used
+            recent = sorted(buckets.items(), key=lambda item: item[1].updated)[-PRUNE_TO:]
+            buckets = dict(recent)
+        self._buckets = buckets
+
+    def _admit(self):
+        budget = self.endpoints.get(request.endpoint)
+        if budget is None:
+            return None
+
+        _, _, expensive = self.budgets[budget]
+        now = time.monotonic()
+        with self._lock:
+            limit = self.expensive_limit if expensive else self.max_concurrent
+            if self.in_flight >= limit:
+                self.shed[budget] += 1
+                return self._reject(503, "Server busy, please retry shortly.", 1)
+
+            wait = self._bucket(self.client_id(), budget, now).take(now)
+            if wait:
+                self.rate_limited[budget] += 1
+                return self._reject(429, "Too many requests.", wait)
+
+            self.in_flight += 1
+            self.allowed[budget] += 1
+        g.rate_limit_admitted = True
+        return None
+
+    def _release(self, exc=None):
+        if g.pop("rate_limit_admitted", False):
+            with self._lock:
+                self.in_flight -= 1
+
+    @staticmethod
+    def _reject(status, message, retry_after):
+        response = jsonify({"status": "error", "message": message})
+        response.status_code = status
+        response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "max_concurrent": self.max_concurrent,
+                "tracked_clients": len(self._buckets),
+                "budgets": {
+                    budget: {
+                        "allowed": self.allowed[budget],
+                        "rate_limited": self.rate_limited[budget],
+                        "shed": self.shed[budget]
+                    } for budget in self.budgets
+                }
+            }
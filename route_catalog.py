@@ -0,0 +1,243 @@
+import json
+import os
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+from config import Config
+from utils import resolve_stop, file_version
+
+ROUTES_FILE = os.path.join(Config.DATA_DIR, "routes.json")
+
+Stop = namedtuple("Stop", ["id", "key", "name", "coords"])
+Route = namedtuple("Route", ["id", "key", "name", "color", "stop_ids", "bus_ids", "aliases"])
+Bus = namedtuple("Bus", ["id", "key", "route_id"])
+
+
+# ==========================================================
+# CATALOG
+# ==========================================================
+class RouteCatalog:
+    """
+    Immutable, integer-indexed view of every route, stop and bus.
+
+    routes, stops and buses are tuples indexed by dense integer ids; the
+    *_index mappings translate string keys (including route aliases such
+    as "mens" for "mens_route") to those ids once, at the edge.
+    """
+
+    __slots__ = ("version", "routes", "stops", "buses",
+                 "route_index", "stop_index", "bus_index", "warnings")
+
+    def __init__(self, version, routes, stops, buses, warnings):
+        route_index = {}
+        for route in routes:
+            route_index[route.key] = route.id
+            for alias in route.aliases:
+                route_index.setdefault(alias, route.id)
+
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "routes", tuple(routes))
+        object.__setattr__(self, "stops", tuple(stops))
+        object.__setattr__(self, "buses", tuple(buses))
+        object.__setattr__(self, "route_index", MappingProxyType(route_index))
+        object.__setattr__(self, "stop_index", MappingProxyType({s.key: s.id for s in stops}))
+        object.__setattr__(self, "bus_index", MappingProxyType({b.key: b.id for b in buses}))
+        object.__setattr__(self, "warnings", tuple(warnings))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RouteCatalog is immutable")
+
+    def route(self, route_key):
+        """Return the Route for a route key or alias, or None."""
+        route_id = self.route_index.get(route_key)
+        return None if route_id is None else self.routes[route_id]
+
+    def route_for_bus(self, bus_key):
+        """Return the Route a bus is assigned to, or None."""
+        bus_id = self.bus_index.get(bus_key)
+        return None if bus_id is None else self.routes[self.buses[bus_id].route_id]
+
+    def route_stops(self, route_id):
+        """Return the Stop tuples of a route, in travel order."""
+        return [self.stops[stop_id] for stop_id in self.routes[route_id].stop_ids]
+
+
+# ==========================================================
+# COMPILER
+# ==========================================================
+def _match_config_route(route_key, config_routes):
+    """Return the Config.BUS_ROUTES key describing routes.json `route_key`."""
+    if route_key in config_routes:
+        return route_key
+    if route_key.endswith("_route") and route_key[:-len("_route")] in config_routes:
+        return route_key[:-len("_route")]
+    return None
+
+
+def _string_field(route, field, route_key, warnings):
+    """Return route[field] if it is a string; warn and return None otherwise."""
+    value = route.get(field)
+    if value is None or isinstance(value, str):
+        return value
+    warnings.append(f"Route '{route_key}': {field} must be a string; ignored")
+    return None
+
+
+def _string_list_field(route, field, route_key, warnings):
+    """Return route[field] if it is a list of strings; warn and return None otherwise."""
+    value = route.get(field)
+    if value is None:
+        return None
+    if not isinstance(value, list):
+        warnings.append(f"Route '{route_key}': {field} must be a list; ignored")
+        return None
+    strings = [item for item in value if isinstance(item, str)]
+    if len(strings) != len(value):
+        warnings.append(f"Route '{route_key}': non-string entries in {field} skipped")
+    return strings
+
+
+def _valid_routes(routes, source, warnings):
+    """Keep only the dict-valued routes of a route mapping."""
+    if not isinstance(routes, dict):
+        warnings.append(f"{source} must map route keys to routes; ignored")
+        return {}
+    valid = {}
+    for route_key, route in routes.items():
+        if isinstance(route, dict):
+            valid[route_key] = route
+        else:
+            warnings.append(f"{source} route '{route_key}' must be an object; skipped")
+    return valid
+
+
+def compile_catalog(config_routes, json_routes, version=None):
+    """
+    Validate Config.BUS_ROUTES and routes.json and merge them into a
+    RouteCatalog.
+
+    routes.json wins where the two disagree, since its keys are the
+    route_id values buses report. Malformed routes and fields are skipped;
+    they, every disagreement, unknown stop and ambiguous stop key are
+    recorded in catalog.warnings.
+    """
+    warnings = []
+    config_routes = _valid_routes(config_routes, "Config.BUS_ROUTES", warnings)
+    json_routes = _valid_routes(json_routes, "routes.json", warnings)
+    stops = []
+    stop_index = {}
+    routes = []
+    buses = []
+    bus_index = {}
+
+    def stop_id_for(stop_key, route_key):
+        if stop_key in stop_index:
+            return stop_index[stop_key]
+        try:
+            name, coords = resolve_stop(stop_key)
+        except KeyError:
+            warnings.append(f"Route '{route_key}': unknown stop '{stop_key}' skipped")
+            return None
+        if (stop_key in Config.BUILDINGS and stop_key in Config.HOSTELS
+                and Config.BUILDINGS[stop_key]["coords"] != Config.HOSTELS[stop_key]["coords"]):
+            warnings.append(f"Stop '{stop_key}' is defined in BUILDINGS and HOSTELS; using BUILDINGS")
+        stop_index[stop_key] = len(stops)
+        stops.append(Stop(len(stops), stop_key, name, tuple(coords)))
+        return stop_index[stop_key]
+
+    sources = []
+    matched_config = set()
+    for route_key, route in json_routes.items():
+        config_key = _match_config_route(route_key, config_routes)
+        config_route = config_routes.get(config_key, {}) if config_key else {}
+        if config_key:
+            matched_config.add(config_key)
+        else:
+            warnings.append(f"Route '{route_key}' is only defined in routes.json")
+        sources.append((route_key, route, config_key, config_route))
+    for config_key, config_route in config_routes.items():
+        if config_key not in matched_config:
+            warnings.append(f"Route '{config_key}' is only defined in Config.BUS_ROUTES")
+            sources.append((config_key, {}, None, config_route))
+
+    for route_key, route, config_key, config_route in sources:
+        waypoints = (_string_list_field(route, "waypoints", route_key, warnings)
+                     or _string_list_field(config_route, "stops", route_key, warnings) or [])
+        bus_keys = (_string_list_field(route, "bus_ids", route_key, warnings)
+                    or _string_list_field(config_route, "bus_ids", route_key, warnings) or [])
+        name = (_string_field(route, "route_name", route_key, warnings)
+                or _string_field(config_route, "route_name", route_key, warnings) or route_key)
+        color = (_string_field(route, "color", route_key, warnings)
+                 or _string_field(config_route, "color", route_key, warnings) or Config.COLORS["primary"])
+
+        if config_key and route:
+            for field, config_field in (("waypoints", "stops"), ("bus_ids", "bus_ids"),
+                                        ("route_name", "route_name"), ("color", "color")):
+                if config_field in config_route and route.get(field) != config_route[config_field]:
+                    warnings.append(f"Route '{route_key}': {field} differs between routes.json "
+                                    f"and Config.BUS_ROUTES['{config_key}']")
+
+        stop_ids = tuple(stop_id for stop_id in (stop_id_for(key, route_key) for key in waypoints)
+                         if stop_id is not None)
+        route_id = len(routes)
+        for bus_key in bus_keys:
+            if bus_key in bus_index:
+                warnings.append(f"Bus '{bus_key}' is assigned to more than one route")
+                continue
+            bus_index[bus_key] = len(buses)
+            buses.append(Bus(len(buses), bus_key, route_id))
+
+        routes.append(Route(
+            id=route_id,
+            key=route_key,
+            name=name,
+            color=color,
+            stop_ids=stop_ids,
+            bus_ids=tuple(bus_index[b] for b in dict.fromkeys(bus_keys)
+                          if buses[bus_index[b]].route_id == route_id),
+            aliases=(config_key,) if config_key and config_key != route_key else ()
+        ))
+
+    return RouteCatalog(version, routes, stops, buses, warnings)
+
+
+# ==========================================================
+# CACHED ACCESS
+# ==========================================================
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog(routes_file=ROUTES_FILE):
+    """
+    Return the current RouteCatalog, recompiling it only when routes.json
+    has changed since the last call. Config.BUS_ROUTES is read at import,
+    so that half of the catalog is fixed for the process lifetime.
+
+    If routes.json cannot be read or compiled, the error is logged and the
+    last good catalog (or a Config-only one) is kept under the new version
+    stamp, so a broken file is not recompiled on every request.
+    """
+    global _catalog
+    version = file_version(routes_file)
+    catalog = _catalog
+    if catalog is not None and catalog.version == version:
+        return catalog
+
+    with _catalog_lock:
+        if _catalog is None or _catalog.version != version:
+            try:
+                json_routes = {}
+                if version is not None:
+                    with open(routes_file, "r") as f:
+                        json_routes = json.load(f)
+                _catalog = compile_catalog(Config.BUS_ROUTES, json_routes, version=version)
+            except Exception as e:
+                print(f"[ERROR] Failed to compile route catalog: {e}. Keeping the previous catalog.")
+                previous = _catalog or compile_catalog(Config.BUS_ROUTES, {})
+                _catalog = RouteCatalog(version, previous.routes, previous.stops,
+                                        previous.buses, previous.warnings)
+                return _catalog
+            for warning in _catalog.warnings:
+                print(f"[WARN] {warning}")
+        return _catalog
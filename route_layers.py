@@ -0,0 +1,127 @@
+import hashlib
+import json
+import math
+import threading
+from config import Config
+from route_catalog import get_catalog
+
+METERS_PER_PIXEL_Z0 = 156543.03392  # Web Mercator ground resolution at zoom 0
+METERS_PER_DEGREE = 111320.0
+SIMPLIFY_PIXELS = 1.0               # drop vertices closer than this to the line
+
+
+# ==========================================================
+# SIMPLIFICATION
+# ==========================================================
+def tolerance_for_zoom(zoom, latitude):
+    """Simplification tolerance in degrees for a map zoom level at a latitude."""
+    meters_per_pixel = METERS_PER_PIXEL_Z0 * math.cos(math.radians(latitude)) / (2 ** zoom)
+    return meters_per_pixel * SIMPLIFY_PIXELS / METERS_PER_DEGREE
+
+
+def _point_line_distance(point, start, end):
+    if start == end:
+        return math.hypot(point[0] - start[0], point[1] - start[1])
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    t = ((point[0] - start[0]) * dx + (point[1] - start[1]) * dy) / (dx * dx + dy * dy)
+    t = max(0.0, min(1.0, t))
+    return math.hypot(point[0] - (start[0] + t * dx), point[1] - (start[1] + t * dy))
+
+
+def simplify_line(points, tolerance):
+    """Douglas-Peucker simplification of a list of [lon, lat] points."""
+    if len(points) < 3:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_dist, index = 0.0, None
+        for i in range(first + 1, last):
+            dist = _point_line_distance(points[i], points[first], points[last])
+            if dist > max_dist:
+                max_dist, index = dist, i
+        if index is not None and max_dist > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [p for p, k in zip(points, keep) if k]
+
+
+# ==========================================================
+# LAYER BUILDER
+# ==========================================================
+def build_route_layers(catalog, zoom):
+    """
+    Build a GeoJSON FeatureCollection from a RouteCatalog: one LineString
+    per route (simplified for `zoom`) and one Point per stop served.
+    """
+    features = []
+    stop_routes = {}
+    tolerance = tolerance_for_zoom(zoom, Config.CAMPUSES["Vellore"]["coords"][0])
+
+    for route in catalog.routes:
+        line = []
+        for stop in catalog.route_stops(route.id):
+            lat, lon = stop.coords
+            line.append([lon, lat])
+            served_by = stop_routes.setdefault(stop.id, [])
+            if route.key not in served_by:
+                served_by.append(route.key)
+
+        if len(line) < 2:
+            continue
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": simplify_line(line, tolerance)},
+            "properties": {
+                "kind": "route",
+                "route_id": route.key,
+                "route_name": route.name,
+                "color": route.color,
+                "bus_ids": [catalog.buses[bus_id].key for bus_id in route.bus_ids]
+            }
+        })
+
+    for stop_id, served_by in stop_routes.items():
+        stop = catalog.stops[stop_id]
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [stop.coords[1], stop.coords[0]]},
+            "properties": {"kind": "stop", "stop_id": stop.key, "name": stop.name, "routes": served_by}
+        })
+
+    return {"type": "FeatureCollection", "zoom": zoom, "features": features}
+
+
+# ==========================================================
+# CACHE
+# ==========================================================
+class RouteLayerCache:
+    """
+    Serialized route layers cached per route catalog version and zoom
+    level. Any change to routes.json yields a new catalog version and
+    invalidates every zoom level.
+    """
+
+    def __init__(self):
+        self._version = None
+        self._layers = {}
+        self._lock = threading.Lock()
+
+    def get(self, zoom):
+        """Return (body, etag) for the route layers at `zoom`."""
+        zoom = max(0, min(int(zoom), Config.MAP_MAX_ZOOM))
+        catalog = get_catalog()
+        with self._lock:
+            if catalog.version != self._version:
+                self._version = catalog.version
+                self._layers = {}
+            if zoom not in self._layers:
+                layers = build_route_layers(catalog, zoom)
+                body = json.dumps(layers, separators=(",", ":"))
+                etag = hashlib.sha1(body.encode("utf-8")).hexdigest()
+                self._layers[zoom] = (body, etag)
+            return self._layers[zoom]
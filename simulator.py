@@ -0,0 +1,309 @@
+import argparse
+import heapq
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from geopy.distance import geodesic
+from config import Config
+from utils import load_json, save_json, calculate_occupancy
+from route_catalog import get_catalog
+
+DATA_DIR = Config.DATA_DIR
+BUS_DATA_FILE = os.path.join(DATA_DIR, "bus_data.json")
+HISTORY_FILE = os.path.join(DATA_DIR, "history.json")
+
+DWELL_SECONDS = 45          # time spent at each stop
+HEADWAY_SECONDS = 120       # departure spacing between buses on the same route
+FLUSH_EVERY_SECONDS = 86400  # simulated seconds between history flushes
+
+
+# ==========================================================
+# TRAFFIC / SCHEDULE HELPERS
+# ==========================================================
+def traffic_factor_at(when):
+    """Traffic multiplier from Config.TRAFFIC_PATTERNS for a simulated datetime."""
+    pattern = Config.TRAFFIC_PATTERNS["weekend" if when.weekday() >= 5 else "weekday"]
+    return pattern.get(when.hour, 1.0)
+
+
+def service_window(when):
+    """Return (start, end) datetimes of the bus schedule for the day of `when`."""
+    schedule = Config.BUS_SCHEDULE["weekend" if when.weekday() >= 5 else "weekday"]
+    day = when.replace(hour=0, minute=0, second=0, microsecond=0)
+    start_h, start_m = map(int, schedule["start_time"].split(":"))
+    end_h, end_m = map(int, schedule["end_time"].split(":"))
+    return (day + timedelta(hours=start_h, minutes=start_m),
+            day + timedelta(hours=end_h, minutes=end_m))
+
+
+def format_duration(seconds):
+    """Format a duration as HH:MM:SS, the shape analytics reads `estimated_time` in."""
+    seconds = int(round(seconds))
+    return f"{seconds // 3600:02d}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+
+
+# ==========================================================
+# SIMULATED BUS
+# ==========================================================
+class SimBus:
+    """State of one simulated bus cycling through its route stops."""
+
+    def __init__(self, bus_id, route_key, stops, capacity, start_offset=0):
+        self.bus_id = bus_id
+        self.start_offset = start_offset  # seconds after service start this bus departs
+        self.route_id = route_key
+        self.stops = stops
+        self.capacity = capacity
+        self.occupancy = 0
+        self.stop_index = 0
+        self.next_stop_index = 1
+        self.location = stops[0][2]
+        self.eta = None
+        self.distance_to_next = 0.0
+        self.delay_minutes = 0
+        self.last_update = None
+
+
+# ==========================================================
+# FLEET SIMULATOR
+# ==========================================================
+class FleetSimulator:
+    """
+    Discrete-event simulator for the shuttle fleet.
+
+    Buses loop over the stops of the route catalog at DEFAULT_SPEED_KMH, slowed
+    by TRAFFIC_PATTERNS, and board/alight passengers at every stop. Each stop
+    arrival is a ping: it is appended to the history (same layout as
+    history.json) and reflected in the live snapshot (same layout as
+    bus_data.json), so the app and analytics read simulated data unchanged.
+    """
+
+    def __init__(self, num_buses=None, start=None, seed=None):
+        self.rng = random.Random(seed)
+        self.now = start or datetime.now().replace(microsecond=0)
+        self.buses = self._build_fleet(num_buses)
+        self.history = {"travel_times": {}, "occupancy_patterns": {}}
+        self.pings = 0
+        self._events = []
+        self._seq = 0
+        self._leg_km = {}
+
+        for index, bus in enumerate(self.buses):
+            self._schedule(self.now + timedelta(seconds=bus.start_offset), index)
+
+    def _build_fleet(self, num_buses):
+        """
+        Every catalog bus first, then synthetic buses spread round-robin
+        over the routes when num_buses exceeds the configured fleet. Buses
+        on one route are staggered by HEADWAY_SECONDS so they do not bunch.
+        """
+        catalog = get_catalog()
+        routes = []
+        for route in catalog.routes:
+            stops = [(stop.key, stop.name, stop.coords) for stop in catalog.route_stops(route.id)]
+            if len(stops) < 2:
+                continue
+            routes.append((route.key, stops, [catalog.buses[bus_id].key for bus_id in route.bus_ids]))
+        if not routes:
+            raise ValueError("Cannot simulate: no route in the catalog has at least two resolvable stops")
+
+        assignments = [(route, bus_id) for route in routes for bus_id in route[2]]
+        if num_buses is None:
+            num_buses = len(assignments)
+        assignments = assignments[:num_buses]
+
+        extra = 0
+        while len(assignments) < num_buses:
+            route = routes[extra % len(routes)]
+            extra += 1
+            assignments.append((route, f"bus_{route[0][0].upper()}S{extra}"))
+
+        buses = []
+        position = {}
+        for (route_key, stops, _), bus_id in assignments:
+            offset = position.get(route_key, 0) * HEADWAY_SECONDS
+            position[route_key] = position.get(route_key, 0) + 1
+            buses.append(SimBus(bus_id, route_key, stops, Config.DEFAULT_CAPACITY, start_offset=offset))
+        return buses
+
+    def _schedule(self, when, bus_index):
+        heapq.heappush(self._events, (when, self._seq, bus_index))
+        self._seq += 1
+
+    def _leg_distance(self, a, b):
+        key = (a[0], b[0])
+        if key not in self._leg_km:
+            self._leg_km[key] = geodesic(a[2], b[2]).km
+        return self._leg_km[key]
+
+    # -------------------- EVENTS --------------------
+    def _arrive(self, bus):
+        """Alight and board passengers at the current stop."""
+        is_terminal = bus.stop_index == len(bus.stops) - 1
+        factor = traffic_factor_at(self.now)
+
+        if is_terminal:
+            alighting = bus.occupancy
+        else:
+            alighting = self.rng.randint(0, bus.occupancy // 2) if bus.occupancy else 0
+        bus.occupancy = calculate_occupancy(bus.occupancy, bus.capacity, boarding=False, passengers=alighting)
+
+        boarding = int(self.rng.randint(0, 8) * factor)
+        bus.occupancy = calculate_occupancy(bus.occupancy, bus.capacity, boarding=True, passengers=boarding)
+
+    def _depart(self, bus):
+        """Leave the current stop; return seconds until arrival at the next one."""
+        origin = bus.stops[bus.stop_index]
+        bus.next_stop_index = (bus.stop_index + 1) % len(bus.stops)
+        target = bus.stops[bus.next_stop_index]
+
+        distance_km = self._leg_distance(origin, target)
+        factor = traffic_factor_at(self.now)
+        speed_kmh = max(Config.DEFAULT_SPEED_KMH / max(factor, 0.1), 0.1)
+        planned = distance_km / Config.DEFAULT_SPEED_KMH * 3600
+        travel = distance_km / speed_kmh * 3600 * self.rng.uniform(0.9, 1.2)
+
+        bus.distance_to_next = round(distance_km, 2)
+        bus.delay_minutes = max(0, int((travel - planned) // 60))
+        bus.eta = self.now + timedelta(seconds=travel)
+
+        self.history["travel_times"].setdefault(f"{origin[0]}-{target[0]}", []).append({
+            "timestamp": str(self.now),
+            "estimated_time": format_duration(travel),
+            "distance": distance_km,
+            "bus_id": bus.bus_id
+        })
+        return travel
+
+    def _record_occupancy(self, bus):
+        time_key = f"{self.now.weekday()}_{self.now.hour}"
+        patterns = self.history["occupancy_patterns"].setdefault(bus.bus_id, {})
+        patterns.setdefault(time_key, []).append({
+            "timestamp": str(self.now),
+            "occupancy": bus.occupancy,
+            "capacity": bus.capacity
+        })
+
+    def step(self):
+        """Process the next event; return its simulated time."""
+        when, _, index = heapq.heappop(self._events)
+        self.now = when
+        bus = self.buses[index]
+
+        start, end = service_window(when)
+        if when < start or when >= end:
+            # Out of service: park at the first stop and rejoin the next service
+            # window at this bus's own stagger offset
+            bus.stop_index = 0
+            bus.occupancy = 0
+            bus.location = bus.stops[0][2]
+            bus.eta = None
+            next_start = start if when < start else service_window(when + timedelta(days=1))[0]
+            self._schedule(next_start + timedelta(seconds=bus.start_offset), index)
+            return when
+
+        bus.stop_index = bus.next_stop_index if bus.eta else bus.stop_index
+        bus.location = bus.stops[bus.stop_index][2]
+        bus.last_update = when
+
+        self._arrive(bus)
+        self._record_occupancy(bus)
+        travel = self._depart(bus)
+        self.pings += 1
+
+        self._schedule(when + timedelta(seconds=DWELL_SECONDS + travel), index)
+        return when
+
+    # -------------------- OUTPUT --------------------
+    def snapshot(self):
+        """Live fleet state in the bus_data.json layout."""
+        buses = {}
+        for bus in self.buses:
+            target = bus.stops[bus.next_stop_index]
+            buses[bus.bus_id] = {
+                "location": list(bus.location),
+                "last_update": (bus.last_update or self.now).strftime("%Y-%m-%d %H:%M:%S"),
+                "eta": bus.eta.strftime("%H:%M:%S") if bus.eta else "",
+                "distance_to_destination": bus.distance_to_next,
+                "destination": target[1] if bus.eta else "Depot",
+                "occupancy": bus.occupancy,
+                "capacity": bus.capacity,
+                "on_time": bus.delay_minutes == 0,
+                "route_id": bus.route_id,
+                "status": ("Out of service" if not bus.eta
+                           else "On schedule" if bus.delay_minutes == 0
+                           else f"Delayed by {bus.delay_minutes} min")
+            }
+        return {"buses": buses, "last_updated": self.now.strftime("%Y-%m-%d %H:%M:%S")}
+
+    def flush_history(self, history_file=HISTORY_FILE):
+        """Write the accumulated history to history_file."""
+        save_json(history_file, self.history)
+
+    def run(self, duration, speedup=0, history_file=HISTORY_FILE, live_file=BUS_DATA_FILE):
+        """
+        Simulate `duration` (timedelta) of fleet time.
+
+        speedup is the time-compression factor (e.g. 100-1000); 0 runs as fast
+        as possible. Pass history_file/live_file as None to skip that output.
+        """
+        end = self.now + duration
+        if history_file:
+            # Extend what is already on disk instead of replacing it
+            self.history = load_json(history_file, default=self.history)
+            self.history.setdefault("travel_times", {})
+            self.history.setdefault("occupancy_patterns", {})
+        wall_start = time.monotonic()
+        sim_start = self.now
+        last_flush = self.now
+
+        while self._events and self._events[0][0] < end:
+            when = self.step()
+
+            if speedup:
+                target_wall = (when - sim_start).total_seconds() / speedup
+                lag = target_wall - (time.monotonic() - wall_start)
+                if lag > 0:
+                    time.sleep(lag)
+                if live_file:
+                    save_json(live_file, self.snapshot())
+
+            if history_file and (when - last_flush).total_seconds() >= FLUSH_EVERY_SECONDS:
+                self.flush_history(history_file)
+                last_flush = when
+
+        self.now = end
+        if history_file:
+            self.flush_history(history_file)
+        if live_file:
+            save_json(live_file, self.snapshot())
+        return self.pings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Accelerated-time SmartStop fleet simulator")
+    parser.add_argument("--buses", type=int, default=None, help="number of buses (default: all configured)")
+    parser.add_argument("--days", type=float, default=1.0, help="simulated days to run")
+    parser.add_argument("--speedup", type=float, default=0,
+                        help="time compression, e.g. 100-1000 (0 = as fast as possible)")
+    parser.add_argument("--start", default=None,
+                        help="simulated start time, e.g. '2025-03-01 07:00' (default: --days before now)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--history-file", default=HISTORY_FILE)
+    parser.add_argument("--no-live", action="store_true", help="do not write the live bus_data.json snapshot")
+    args = parser.parse_args()
+
+    if args.start:
+        start = datetime.fromisoformat(args.start)
+    else:
+        # Generate past load by default, ending now, so analytics windows see it
+        start = datetime.now().replace(microsecond=0) - timedelta(days=args.days)
+    simulator = FleetSimulator(num_buses=args.buses, start=start, seed=args.seed)
+    pings = simulator.run(
+        timedelta(days=args.days),
+        speedup=args.speedup,
+        history_file=args.history_file,
+        live_file=None if args.no_live else BUS_DATA_FILE
+    )
+    print(f"Simulated {args.days} day(s) for {len(simulator.buses)} buses: {pings} pings")
@@ -5,6 +5,7 @@ from geopy.distance import geodesic
 import qrcode
 from dateutil.parser import parse
 import random
+from config import Config
 
 # ==========================================================
 # JSON UTILITIES
@@ -25,6 +26,15 @@ def load_json(file_path, default=None):
     return default
 
 
+def file_version(file_path):
+    """Return a cheap change stamp (mtime_ns, size) for a file, or None if it is missing."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
 def save_json(file_path, data):
     """Save data to a JSON file safely."""
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
@@ -160,6 +170,14 @@ def get_route_info(route_id, routes_data):
     return routes_data[route_id]
 
 
+def resolve_stop(stop_key):
+    """Return (name, coords) for a stop key, looking in Config.BUILDINGS then Config.HOSTELS."""
+    place = Config.BUILDINGS.get(stop_key) or Config.HOSTELS.get(stop_key)
+    if place is None:
+        raise KeyError(f"Unknown stop '{stop_key}'")
+    return place["name"], place["coords"]
+
+
 def get_start_and_end_from_route(route_id, routes_data):
     """Return the start and end point names for a given route."""
     route = get_route_info(route_id, routes_data)